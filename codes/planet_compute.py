@@ -94,6 +94,9 @@ class Planets:
         self.planets_perhs = np.array([])
         self.planets_aphs = np.array([])
         self.planets_curr_pos = np.array([])
+        self.planets_incl = np.array([])
+        self.planets_intr_ang = np.array([])
+        self.planets_maj_ang = np.array([])
 
     def calc_curr_pos_vector(self, planet_index):
         idx = planet_index
@@ -109,6 +112,35 @@ class Planets:
             1 - self.planets_ecc[idx] * np.cos(self.planets_theta[idx]))
         return pos_vector.reshape([-1, 3])
 
+    def calc_all_pos_vectors(self):
+        # Vectorised form of calc_curr_pos_vector over every planet at once.
+        ang = self.planets_theta + self.planets_maj_ang
+        incl = self.planets_incl
+        node = self.planets_intr_ang
+        x1, y1 = np.cos(ang), np.sin(ang)
+        y2, z2 = y1*np.cos(incl), y1*np.sin(incl)
+        pos_vectors = np.stack(
+            [x1*np.cos(node) - y2*np.sin(node),
+             x1*np.sin(node) + y2*np.cos(node),
+             z2], axis=1)
+        radius = self.planets_sem_maj * (
+            1 - self.planets_ecc * np.cos(self.planets_theta))
+        return pos_vectors * radius[:, None]
+
+    def calc_orbit(self, planet_index, n_points=2048):
+        # Closed orbit path sampled over one revolution of theta.
+        planet = self.planets[planet_index]
+        theta = np.linspace(0, 2*np.pi, n_points)
+        ang = theta + planet.major_axis_angle_in_planet_plane
+        path = np.stack(
+            [np.cos(ang), np.sin(ang), np.zeros_like(ang)], axis=1)
+        rot_mat = np.matmul(
+            get_rotation_matrix(planet.plane_intersection_angle_with_maj_ax),
+            get_rotation_matrix(planet.orbit_inclination, axis='x'))
+        path = np.matmul(path, rot_mat.T)
+        radius = planet.sem_maj_ax * (1 - planet.orbit_ecc * np.cos(theta))
+        return path * radius[:, None]
+
     def add_planet(self, planet=None):
         if planet != None:
             if self.planets == []:
@@ -118,6 +150,11 @@ class Planets:
                 self.planets_ecc = np.array([planet.orbit_ecc])
                 self.planets_perhs = np.array([planet.perh])
                 self.planets_aphs = np.array([planet.aph])
+                self.planets_incl = np.array([planet.orbit_inclination])
+                self.planets_intr_ang = np.array(
+                    [planet.plane_intersection_angle_with_maj_ax])
+                self.planets_maj_ang = np.array(
+                    [planet.major_axis_angle_in_planet_plane])
                 self.planets_curr_pos = self.calc_curr_pos_vector(-1)
 
             if planet not in self.planets:
@@ -132,6 +169,14 @@ class Planets:
                     [self.planets_perhs, np.array([planet.perh])])
                 self.planets_aphs = np.concatenate(
                     [self.planets_aphs, np.array([planet.aph])])
+                self.planets_incl = np.concatenate(
+                    [self.planets_incl, np.array([planet.orbit_inclination])])
+                self.planets_intr_ang = np.concatenate(
+                    [self.planets_intr_ang,
+                     np.array([planet.plane_intersection_angle_with_maj_ax])])
+                self.planets_maj_ang = np.concatenate(
+                    [self.planets_maj_ang,
+                     np.array([planet.major_axis_angle_in_planet_plane])])
                 self.planets_curr_pos = np.concatenate(
                     [self.planets_curr_pos, self.calc_curr_pos_vector(-1)])
 
@@ -153,16 +198,21 @@ class Planets:
 
     def update(self):
         self.update_theta()
-        for i in range(len(self.planets)):
-            self.update_curr_pos(i)
+        self.planets_curr_pos = self.calc_all_pos_vectors()
 
     def update_and_fetch_pos(self, units='AU', update=True):
-        if self.update:
+        curr_pos = self.update_and_fetch_pos_array(units=units, update=update)
+        return {self.planets[i].name: curr_pos[i] for i in range(len(self.planets))}
+
+    def update_and_fetch_pos_array(self, units='AU', update=True):
+        # Positions as an (N, 3) array ordered like self.planets, for
+        # renderers that push all bodies at once. Metres unless units='AU'.
+        if update:
             self.update()
+        conv_factor = 1
         if units == 'AU':
             conv_factor = 1/Constants.AU_DIST
-        curr_pos = self.planets_curr_pos*conv_factor
-        return {self.planets[i].name: curr_pos[i] for i in range(len(self.planets))}
+        return self.planets_curr_pos*conv_factor
 
 
 if __name__ == '__main__':
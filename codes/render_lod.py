@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ============================================================================
+"""
+Description: Level-of-detail rendering of many bodies and their orbits.
+
+All bodies share one glyph source, so a frame is a single array update
+no matter how many bodies there are. Orbits are merged into one polyline
+source and decimated by screen-space error. Glyph resolution follows the
+apparent size of the bodies on screen.
+"""
+# ============================================================================
+
+import numpy as np
+
+
+# Allowed deviation of a decimated orbit from the full one, in pixels.
+ORBIT_PIXEL_TOL = 0.5
+# Orbit detail finer than this fraction of the orbit size is never drawn.
+ORBIT_MIN_REL_ERR = 1e-5
+# Sphere resolutions picked from by apparent body radius (in pixels).
+GLYPH_RESOLUTIONS = ((2, 6), (8, 10), (24, 16), (64, 24), (np.inf, 32))
+# Percentile of apparent radii that the shared resolution is chosen for.
+GLYPH_SIZE_PERCENTILE = 90
+# Upper bound on sphere triangles summed over all bodies.
+GLYPH_TRIANGLE_BUDGET = 500000
+
+
+def compute_rdp_errors(path, min_err=0):
+    """Douglas-Peucker importance of every vertex of a polyline.
+
+    Keeping the vertices whose error is >= tol gives the same result as
+    running Douglas-Peucker with tolerance tol, so the expensive part is
+    done once and each level of detail is just a mask. Segments which
+    already fit within min_err are not refined further and their inner
+    vertices are left at zero.
+    """
+    path = np.asarray(path, dtype=float)
+    n_points = len(path)
+    errors = np.zeros(n_points)
+    errors[0] = errors[-1] = np.inf
+    firsts = np.array([0])
+    lasts = np.array([n_points - 1])
+    parent_errs = np.array([np.inf])
+    # Every open segment of one recursion level is split in a single pass.
+    while len(firsts):
+        open_segs = lasts - firsts >= 2
+        firsts = firsts[open_segs]
+        lasts = lasts[open_segs]
+        parent_errs = parent_errs[open_segs]
+        if not len(firsts):
+            break
+        n_inner = lasts - firsts - 1
+        starts = np.concatenate([[0], np.cumsum(n_inner)[:-1]])
+        seg_of = np.repeat(np.arange(len(firsts)), n_inner)
+        idx = np.arange(len(seg_of)) - starts[seg_of] + firsts[seg_of] + 1
+
+        seg = (path[lasts] - path[firsts])[seg_of]
+        rel = path[idx] - path[firsts][seg_of]
+        seg_len = np.linalg.norm(seg, axis=1)
+        dist = np.where(
+            seg_len > 0,
+            np.linalg.norm(np.cross(rel, seg), axis=1)
+            / np.where(seg_len > 0, seg_len, 1),
+            np.linalg.norm(rel, axis=1))
+
+        max_dist = np.maximum.reduceat(dist, starts)
+        # First vertex reaching the maximum, as np.argmax would pick.
+        at_max = np.flatnonzero(dist == max_dist[seg_of])
+        _, first_at_max = np.unique(seg_of[at_max], return_index=True)
+        mids = idx[at_max[first_at_max]]
+
+        split = max_dist > min_err
+        # Clamp to the parent so that the errors are nested.
+        errs = np.minimum(max_dist, parent_errs)[split]
+        mids = mids[split]
+        errors[mids] = errs
+        firsts, lasts = (np.concatenate([firsts[split], mids]),
+                         np.concatenate([mids, lasts[split]]))
+        parent_errs = np.concatenate([errs, errs])
+    return errors
+
+
+def world_per_pixel(scene, points, margins=0):
+    """Size of one screen pixel, in world units, at each of the points.
+
+    margins brings each point that much closer to the camera, which gives
+    the finest pixel size over a sphere of that radius around the point.
+    """
+    camera = scene.camera
+    points = np.asarray(points, dtype=float)
+    height = max(scene.render_window.size[1], 1)
+    if camera.parallel_projection:
+        return np.full(points.shape[:-1], 2*camera.parallel_scale/height)
+    dist = np.linalg.norm(points - np.array(camera.position), axis=-1)
+    dist = np.maximum(dist - margins, 1e-3*dist)
+    return 2*dist*np.tan(np.radians(camera.view_angle)/2)/height
+
+
+def choose_glyph_resolution(pixel_radius, n_bodies=1):
+    """Sphere resolution suitable for a body of the given apparent radius.
+
+    The resolution is lowered until n_bodies spheres, at about
+    2*resolution**2 triangles each, fit in GLYPH_TRIANGLE_BUDGET.
+    """
+    resolutions = [res for _, res in GLYPH_RESOLUTIONS]
+    for i, (max_radius, resolution) in enumerate(GLYPH_RESOLUTIONS):
+        if pixel_radius <= max_radius:
+            break
+    while i > 0 and 2*resolutions[i]**2*n_bodies > GLYPH_TRIANGLE_BUDGET:
+        i -= 1
+    return resolutions[i]
+
+
+class BodyGlyphs:
+    """All bodies drawn as sphere glyphs of a single point source.
+
+    The bodies share one sphere resolution, so it is chosen for a high
+    percentile of their apparent sizes rather than the largest one.
+    """
+
+    def __init__(self, mlab, positions, sizes, colors):
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.sizes = np.asarray(sizes, dtype=float)
+        # Sizes go through the vectors and colours through the scalars,
+        # so that they can be set independently.
+        vectors = np.zeros_like(positions)
+        vectors[:, 0] = self.sizes
+        self.source = mlab.pipeline.vector_scatter(
+            positions[:, 0], positions[:, 1], positions[:, 2],
+            vectors[:, 0], vectors[:, 1], vectors[:, 2],
+            scalars=np.arange(len(positions), dtype=float))
+        self.glyph = mlab.pipeline.glyph(
+            self.source, mode='sphere', scale_mode='vector',
+            scale_factor=1.0, resolution=6)
+        self.glyph.glyph.color_mode = 'color_by_scalar'
+        self.glyph.glyph.glyph.orient = False
+        self.glyph.glyph.glyph.clamping = False
+
+        lut_manager = self.glyph.module_manager.scalar_lut_manager
+        lut = np.ones((len(positions), 4))
+        lut[:, :3] = colors
+        lut_manager.lut.number_of_table_values = len(positions)
+        lut_manager.lut.table = (lut*255).astype(np.uint8)
+        lut_manager.use_default_range = False
+        lut_manager.data_range = (0, max(len(positions) - 1, 1))
+        self.resolution = None
+
+    def update(self, positions):
+        self.source.mlab_source.trait_set(
+            points=np.asarray(positions, dtype=float).reshape(-1, 3))
+
+    def update_lod(self, scene):
+        points = self.source.mlab_source.points
+        if len(points) == 0:
+            return
+        pixel_radius = np.percentile(
+            0.5*self.sizes/world_per_pixel(scene, points),
+            GLYPH_SIZE_PERCENTILE)
+        resolution = choose_glyph_resolution(pixel_radius, len(points))
+        if resolution != self.resolution:
+            sphere = self.glyph.glyph.glyph_source.glyph_source
+            sphere.theta_resolution = resolution
+            sphere.phi_resolution = resolution
+            self.resolution = resolution
+
+
+class OrbitLines:
+    """All orbit paths drawn as one line source, decimated to the screen."""
+
+    def __init__(self, mlab, paths, color=(1, 1, 1), line_width=1.0):
+        self.paths, self.errors, centers, radii = [], [], [], []
+        for path in paths:
+            path = np.asarray(path, dtype=float)
+            center = path.mean(axis=0)
+            radius = np.max(np.linalg.norm(path - center, axis=1))
+            errors = compute_rdp_errors(path, ORBIT_MIN_REL_ERR*radius)
+            # Vertices that no level of detail uses are dropped right away.
+            self.paths.append(path[errors > 0])
+            self.errors.append(errors[errors > 0])
+            centers.append(center)
+            radii.append(radius)
+        self.centers = np.array(centers)
+        self.radii = np.array(radii)
+        # Imported here so the numerical helpers above work without Mayavi.
+        from tvtk.api import tvtk
+        self.polydata = tvtk.PolyData()
+        self.source = mlab.pipeline.add_dataset(self.polydata)
+        self.surface = mlab.pipeline.surface(
+            self.source, color=color, line_width=line_width)
+        self.tolerances = None
+
+    def update_lod(self, scene, pixel_tol=ORBIT_PIXEL_TOL):
+        tolerances = pixel_tol*world_per_pixel(
+            scene, self.centers, self.radii)
+        # A finer mask stays within pixel_tol when zooming out, so it is
+        # kept until it carries twice the needed detail. Zooming in always
+        # rebuilds.
+        if self.tolerances is not None and np.all(
+                (tolerances >= self.tolerances)
+                & (tolerances < 2*self.tolerances)):
+            return
+        self.tolerances = tolerances
+
+        points, lines, offset = [], [], 0
+        for path, errors, tol in zip(self.paths, self.errors, tolerances):
+            kept = path[errors >= tol]
+            points.append(kept)
+            # tvtk takes a list of 2D arrays, each row being one cell.
+            lines.append(np.arange(offset, offset + len(kept))[None, :])
+            offset += len(kept)
+        self.polydata.points = np.concatenate(points)
+        self.polydata.lines = lines
+        self.source.update()
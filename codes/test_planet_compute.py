@@ -0,0 +1,42 @@
+import numpy as np
+
+from planets_data import Constants
+from planet_compute import Planet, Planets
+
+
+def make_planets():
+    plts = Planets()
+    plts.add_planet(Planet('earth', 6*(10**24), init_theta=5))
+    plts.add_planet(Planet(
+        'merc', 6*(10**23), sem_maj_ax=0.4, orb_incl=5, orb_ecc=0.2,
+        intr_pl_ang=45, maj_ang_pp=10, init_theta=30))
+    plts.add_planet(Planet(
+        'far', 10**25, sem_maj_ax=30, orb_incl=20, orb_ecc=0.6,
+        intr_pl_ang=200, maj_ang_pp=120, init_theta=250))
+    return plts
+
+
+def test_all_pos_vectors_match_single():
+    plts = make_planets()
+    for _ in range(5):
+        plts.update_theta()
+        single = np.concatenate(
+            [plts.calc_curr_pos_vector(i) for i in range(len(plts.planets))])
+        assert np.allclose(
+            plts.calc_all_pos_vectors(), single,
+            rtol=0, atol=1e-12*Constants.AU_DIST)
+
+
+def test_orbit_passes_through_positions():
+    plts = make_planets()
+    orbit = plts.calc_orbit(1, n_points=100)
+    plts.planets_theta[1] = np.linspace(0, 2*np.pi, 100)[37]
+    assert np.allclose(orbit[37], plts.calc_curr_pos_vector(1)[0])
+
+
+def test_fetch_pos_dict_matches_array():
+    plts = make_planets()
+    arr = plts.update_and_fetch_pos_array()
+    pos = plts.update_and_fetch_pos(update=False)
+    assert list(pos) == ['earth', 'merc', 'far']
+    assert np.allclose(np.array(list(pos.values())), arr)
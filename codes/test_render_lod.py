@@ -0,0 +1,187 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from render_lod import (
+    GLYPH_RESOLUTIONS, GLYPH_TRIANGLE_BUDGET, ORBIT_PIXEL_TOL, BodyGlyphs,
+    OrbitLines, choose_glyph_resolution, compute_rdp_errors, world_per_pixel)
+
+
+def make_scene(position=(0, 0, 10), view_angle=90, parallel_projection=False,
+               parallel_scale=5, size=(300, 200)):
+    # Just the parts of a tvtk scene that the level of detail reads.
+    camera = SimpleNamespace(
+        position=position, view_angle=view_angle,
+        parallel_projection=parallel_projection,
+        parallel_scale=parallel_scale)
+    return SimpleNamespace(
+        camera=camera, render_window=SimpleNamespace(size=size))
+
+
+@pytest.fixture
+def mlab():
+    pytest.importorskip('tvtk')
+    mlab = pytest.importorskip('mayavi.mlab')
+    mlab.options.backend = 'test'
+    yield mlab
+    mlab.close(all=True)
+
+
+def douglas_peucker(path, tol):
+    # Direct recursive Douglas-Peucker, returning the indices it keeps.
+    def simplify(first, last):
+        if last - first < 2:
+            return []
+        seg = path[last] - path[first]
+        rel = path[first+1:last] - path[first]
+        seg_len = np.linalg.norm(seg)
+        if seg_len == 0:
+            dist = np.linalg.norm(rel, axis=1)
+        else:
+            dist = np.linalg.norm(np.cross(rel, seg), axis=1)/seg_len
+        idx = np.argmax(dist)
+        if dist[idx] < tol:
+            return []
+        mid = first + 1 + idx
+        return simplify(first, mid) + [mid] + simplify(mid, last)
+    return [0] + simplify(0, len(path) - 1) + [len(path) - 1]
+
+
+def test_rdp_errors_match_douglas_peucker():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        path = np.cumsum(rng.normal(size=(rng.integers(3, 300), 3)), axis=0)
+        errors = compute_rdp_errors(path)
+        for tol in [0.1, 0.5, 1, 2, 5]:
+            kept = np.flatnonzero(errors >= tol)
+            assert list(kept) == douglas_peucker(path, tol)
+
+
+def test_rdp_errors_closed_path():
+    theta = np.linspace(0, 2*np.pi, 200)
+    path = np.stack([np.cos(theta), np.sin(theta), 0*theta], axis=1)
+    errors = compute_rdp_errors(path)
+    for tol in [1e-4, 1e-2, 0.5]:
+        kept = np.flatnonzero(errors >= tol)
+        assert list(kept) == douglas_peucker(path, tol)
+
+
+def test_rdp_errors_min_err_culls_fine_detail():
+    theta = np.linspace(0, 2*np.pi, 2048)
+    path = np.stack([np.cos(theta), np.sin(theta), 0*theta], axis=1)
+    full = compute_rdp_errors(path)
+    culled = compute_rdp_errors(path, min_err=1e-3)
+    assert (culled > 0).sum() < (full > 0).sum()
+    assert np.all(culled[culled > 0] == full[culled > 0])
+
+
+def test_glyph_resolution_grows_with_size():
+    resolutions = [choose_glyph_resolution(r) for r in [1, 5, 20, 50, 500]]
+    assert resolutions == sorted(resolutions)
+    assert resolutions[0] == GLYPH_RESOLUTIONS[0][1]
+    assert resolutions[-1] == GLYPH_RESOLUTIONS[-1][1]
+
+
+def test_glyph_resolution_respects_triangle_budget():
+    for n_bodies in [10, 1000, 100000]:
+        resolution = choose_glyph_resolution(500, n_bodies)
+        assert (resolution == GLYPH_RESOLUTIONS[0][1]
+                or 2*resolution**2*n_bodies <= GLYPH_TRIANGLE_BUDGET)
+
+
+def test_world_per_pixel_perspective():
+    scene = make_scene()
+    points = np.array([[0, 0, 0], [0, 0, -10], [0, 0, 5]])
+    # 2*dist*tan(45 deg)/200 pixels.
+    assert np.allclose(world_per_pixel(scene, points), [0.1, 0.2, 0.05])
+    assert np.allclose(
+        world_per_pixel(scene, points, margins=[5, 5, 10]),
+        [0.05, 0.15, 0.05*1e-3])
+
+
+def test_world_per_pixel_parallel():
+    scene = make_scene(parallel_projection=True)
+    points = np.zeros((4, 3))
+    assert np.allclose(world_per_pixel(scene, points), np.full(4, 0.05))
+
+
+def orbit_cells(polydata):
+    conn = polydata.lines.to_array()
+    cells, i = [], 0
+    while i < len(conn):
+        cells.append(conn[i+1:i+1+conn[i]])
+        i += conn[i] + 1
+    return cells
+
+
+def distance_to_polyline(points, line):
+    # Distance from each point to the nearest segment of the polyline.
+    a, b = line[:-1], line[1:]
+    ab = b - a
+    t = np.einsum('psk,sk->ps', points[:, None] - a, ab)
+    t = np.clip(t/np.maximum(np.einsum('sk,sk->s', ab, ab), 1e-300), 0, 1)
+    nearest = a + t[..., None]*ab
+    return np.linalg.norm(points[:, None] - nearest, axis=2).min(axis=1)
+
+
+def test_orbit_lines_cells(mlab):
+    theta = np.linspace(0, 2*np.pi, 2048)
+    circle = np.stack([np.cos(theta), np.sin(theta), 0*theta], axis=1)
+    paths = [r*circle for r in (1, 3, 10)]
+    orbits = OrbitLines(mlab, paths)
+    scene = make_scene(position=(0, 0, 100))
+    orbits.update_lod(scene)
+
+    points = orbits.polydata.points.to_array()
+    cells = orbit_cells(orbits.polydata)
+    assert len(cells) == len(paths)
+    assert np.array_equal(np.concatenate(cells), np.arange(len(points)))
+    tols = ORBIT_PIXEL_TOL*world_per_pixel(scene, orbits.centers, orbits.radii)
+    for cell, path, tol in zip(cells, paths, tols):
+        kept = points[cell]
+        assert 2 < len(kept) < len(path)
+        assert np.allclose(kept[[0, -1]], path[[0, -1]])
+        assert distance_to_polyline(path, kept).max() <= tol
+
+
+def test_orbit_lines_rebuild_on_zoom(mlab):
+    theta = np.linspace(0, 2*np.pi, 2048)
+    paths = [np.stack([np.cos(theta), np.sin(theta), 0*theta], axis=1)]
+    orbits = OrbitLines(mlab, paths)
+    orbits.update_lod(make_scene(position=(0, 0, 100)))
+    far = orbits.polydata.number_of_points
+    cached = orbits.tolerances
+    # Zooming out a little keeps the finer mask.
+    orbits.update_lod(make_scene(position=(0, 0, 130)))
+    assert orbits.polydata.number_of_points == far
+    assert np.array_equal(orbits.tolerances, cached)
+    # Zooming in rebuilds, however slightly.
+    scene = make_scene(position=(0, 0, 90))
+    orbits.update_lod(scene)
+    assert np.allclose(
+        orbits.tolerances,
+        ORBIT_PIXEL_TOL*world_per_pixel(scene, orbits.centers, orbits.radii))
+    orbits.update_lod(make_scene(position=(0, 0, 5)))
+    assert orbits.polydata.number_of_points > far
+    assert len(orbit_cells(orbits.polydata)) == 1
+
+
+def test_body_glyphs(mlab):
+    rng = np.random.default_rng(0)
+    colors = rng.random((5, 3))
+    bodies = BodyGlyphs(mlab, rng.random((5, 3)), np.ones(5), colors)
+    lut = bodies.glyph.module_manager.scalar_lut_manager.lut
+    assert np.array_equal(
+        lut.table.to_array()[:, :3], (colors*255).astype(np.uint8))
+
+    positions = rng.random((5, 3))
+    bodies.update(positions)
+    assert np.allclose(
+        bodies.source.mlab_source.dataset.points.to_array(), positions)
+
+    sphere = bodies.glyph.glyph.glyph_source.glyph_source
+    bodies.update_lod(make_scene(position=(0, 0, 200)))
+    far = sphere.theta_resolution
+    bodies.update_lod(make_scene(position=(0, 0, 2)))
+    assert sphere.theta_resolution > far
@@ -22,6 +22,7 @@ from mayavi.core.ui.api import MayaviScene, SceneEditor, MlabSceneModel
 from planets_data import PlanetData, Constants
 from planet_compute import Planets, Planet
 from grav_pot_compute import compute_grav_pot
+from render_lod import BodyGlyphs, OrbitLines
 
 
 pl_map = {
@@ -48,12 +49,6 @@ for name in pl_map:
             maj_ang_pp=pl_data['Angle-maj_ax_pp'],
             init_theta=pl_data['Initial Theta']))
 
-orbit_data = {name: [] for name in pl_map}
-for i in range(25000):
-    curr_data = plts.update_and_fetch_pos()
-    for name in pl_map:
-        orbit_data[name].append(curr_data[name])
-
 
 class Planet_ui(HasTraits):
     name = Str()
@@ -123,41 +118,46 @@ class PlanetarySystemModel(HasTraits):
 
     def __init__(self, planets):
         super().__init__()
-        self.planet_plt = []
         self.sun_plot = self.scene.mlab.points3d(
             0, 0, 0, color=(1, 1, 0), resolution=100, scale_factor=0.4)
-        curr_data = plts.update_and_fetch_pos()
-        for name in pl_map:
-            curr_pose = curr_data[name]
-            self.planet_plt.append(self.scene.mlab.points3d(
-                curr_pose[0],
-                curr_pose[1],
-                curr_pose[2],
-                color=pl_map[name]['Color'],
-                resolution=100,
-                scale_factor=np.log10(pl_map[name]['Semi Major Axis']+1)*0.7)
-            )
-
-            orbit = np.array(orbit_data[name]).T
-            self.scene.mlab.plot3d(
-                orbit[0],
-                orbit[1],
-                orbit[2],
-                tube_radius=0.01, color=(1, 1, 1))
+        self.planet_plt = BodyGlyphs(
+            self.scene.mlab,
+            plts.update_and_fetch_pos_array(),
+            sizes=[np.log10(pl_map[name]['Semi Major Axis']+1)*0.7
+                   for name in pl_map],
+            colors=[pl_map[name]['Color'] for name in pl_map])
+        # A generator, so only the decimated paths outlive OrbitLines.
+        self.orbit_plt = OrbitLines(
+            self.scene.mlab,
+            (plts.calc_orbit(i)/Constants.AU_DIST
+             for i in range(len(plts.planets))))
         self.is_dark = True
         self.is_playing = False
+        self.lod_observer = None
         self.scene.scene.background = (0, 0, 0)
         self.planets = planets
         # self.plot_potential()
 
     @ observe('potential_threshold,speed,scene.activated')
     def update_plot(self, event=None):
-        for i, name in enumerate(pl_map):
-            curr_pose = plts.update_and_fetch_pos()
-            self.planet_plt[i].mlab_source.trait_set(
-                x=curr_pose[name][0],
-                y=curr_pose[name][1],
-                z=curr_pose[name][2])
+        self.planet_plt.update(plts.update_and_fetch_pos_array())
+
+    @ observe('scene.activated')
+    def attach_lod(self, event=None):
+        # The renderer raises StartEvent before every render, whatever
+        # moved the camera (mouse, toolbar or mlab.view) or the bodies.
+        # A re-activated scene swaps in the new observer for the old one.
+        if self.lod_observer is not None:
+            renderer, observer_id = self.lod_observer
+            renderer.remove_observer(observer_id)
+        renderer = self.scene.scene.renderer
+        self.lod_observer = (
+            renderer, renderer.add_observer('StartEvent', self.update_lod))
+        self.update_lod()
+
+    def update_lod(self, *args):
+        self.planet_plt.update_lod(self.scene.scene)
+        self.orbit_plt.update_lod(self.scene.scene)
 
     # @ observe('potential_threshold,scene.activated')
     def plot_potential(self, event=None):
@@ -181,14 +181,8 @@ class PlanetarySystemModel(HasTraits):
 
     def _play_fired(self):
         self.is_playing = not self.is_playing
-        _ = [plts.update_and_fetch_pos() for i in range(self.speed)]
-        curr_data = plts.update_and_fetch_pos()
-        for i, name in enumerate(pl_map):
-            curr_pose = curr_data[name]
-            self.planet_plt[i].mlab_source.trait_set(
-                x=curr_pose[0],
-                y=curr_pose[1],
-                z=curr_pose[2])
+        _ = [plts.update() for i in range(self.speed)]
+        self.planet_plt.update(plts.update_and_fetch_pos_array())
 
     def _reset_fired(self):
         self.planets = planets_list